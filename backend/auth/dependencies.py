@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
 from auth.service import verify_token, get_user_by_email
 
 security = HTTPBearer()
@@ -24,4 +25,16 @@ def get_current_user(
     if user is None:
         raise credentials_exception
     
-    return user
\ No newline at end of file
+    return user
+
+def is_admin(user) -> bool:
+    return user.email in settings.ADMIN_EMAILS
+
+def get_admin_user(current_user = Depends(get_current_user)):
+    if not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return current_user
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config.settings import settings
@@ -12,4 +12,46 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def register_models():
+    """Import every model module so mappers and relationships resolve
+
+    Needed by any process that queries the database without importing
+    main (e.g. python -m jobs.worker or storage.scrubber).
+    """
+    import auth.models  # noqa: F401
+    import files.models  # noqa: F401
+    import jobs.models  # noqa: F401
+    import storage.models  # noqa: F401
+
+def init_db():
+    """Create missing tables; run once per deployment, not per worker"""
+    register_models()
+    
+    from files.search import init_search_index
+    
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    init_search_index()
+
+def add_missing_columns():
+    """Add nullable columns introduced after a table was first created
+
+    create_all never alters existing tables, so new optional columns are
+    added here. Anything more involved needs a real migration.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                if column.server_default is not None and isinstance(column.server_default.arg, str):
+                    ddl += f" DEFAULT '{column.server_default.arg}'"
+                connection.execute(text(ddl))
\ No newline at end of file
@@ -7,14 +7,64 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ADMIN_EMAILS: list = []  # May read process-wide stats endpoints
     
     # File Storage
     UPLOAD_DIR: Path = Path("uploads")
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
     
+    # Bulk ZIP downloads
+    ZIP_MAX_FILES: int = 1000
+    ZIP_CHUNK_SIZE: int = 256 * 1024  # Decrypt buffer per entry
+    
+    # Preview cache (decrypted content, per process)
+    PREVIEW_CACHE_ENABLED: bool = False
+    PREVIEW_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64MB
+    PREVIEW_CACHE_TTL_SECONDS: int = 300
+    PREVIEW_CACHE_CHUNK_SIZE: int = 256 * 1024  # 256KB
+    
+    # Preview derivatives (thumbnails and first-page renders)
+    PREVIEW_SIZES: list = [128, 512]  # Max edge in pixels
+    PREVIEW_JPEG_QUALITY: int = 80
+    
+    # Transfer fair-share limits, enforced per worker process: with WORKERS
+    # workers the server-wide totals are WORKERS times these (0 = unlimited bandwidth)
+    TRANSFER_USER_BYTES_PER_SEC: int = 20 * 1024 * 1024  # 20MB/s per user per worker
+    TRANSFER_WORKER_BYTES_PER_SEC: int = 0
+    TRANSFER_USER_MAX_CONCURRENT: int = 3  # Further requests get 429 at once
+    TRANSFER_WORKER_MAX_CONCURRENT: int = 24  # Slots + waiters stay below the 40-thread pool
+    TRANSFER_WORKER_MAX_WAITERS: int = 4  # Requests that may queue for a worker slot, one per user
+    TRANSFER_SLOT_WAIT_SECONDS: float = 10.0  # Queue this long before answering 429
+    TRANSFER_CHUNK_SIZE: int = 64 * 1024  # 64KB
+    
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./secureshare.db")
     
+    # Server
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 2  # Production mode only
+    GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    STARTUP_BUDGET_SECONDS: float = 2.0  # Max import time of main:app per worker
+    AUTO_MIGRATE: bool = True  # Create tables on app startup (disabled per worker in production)
+    
+    # Background jobs (python -m jobs.worker)
+    JOB_WORKERS: int = 1
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: int = 10  # Doubles on every retry
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300  # Running jobs older than this are reclaimed
+    
+    # Integrity scrubber (python -m storage.scrubber)
+    SCRUB_ENABLED: bool = False  # Run alongside the server from start.py
+    SCRUB_BYTES_PER_SECOND: int = 10 * 1024 * 1024  # Blob read budget, 0 = unlimited
+    SCRUB_CPU_DUTY_CYCLE: float = 0.25  # Max fraction of one core spent decrypting/hashing
+    SCRUB_BATCH_SIZE: int = 100
+    SCRUB_CHUNK_SIZE: int = 256 * 1024  # Read and decrypt unit, charged to the I/O budget
+    SCRUB_PASS_INTERVAL_SECONDS: int = 60 * 60  # Pause between full passes
+    SCRUB_ORPHAN_GRACE_SECONDS: int = 60 * 60  # Ignore blobs newer than this (upload in flight)
+    SCRUB_RETRY_SECONDS: int = 30  # Back-off after a failed batch (e.g. database locked)
+    
     # CORS
     ALLOWED_ORIGINS: list = ["http://localhost:3000", "http://localhost:5173"]
     
@@ -0,0 +1,111 @@
+import io
+import logging
+import os
+from typing import List, Optional
+from files.encryption import get_encryption
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_MIME_TYPE = 'image/jpeg'
+
+# Source types we can render a small preview image for
+DERIVABLE_MIME_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'application/pdf'}
+
+def is_derivable(mime_type: str) -> bool:
+    """Check if a thumbnail can be rendered for this file type"""
+    return mime_type in DERIVABLE_MIME_TYPES
+
+def derivative_path(encrypted_path: str, size: int) -> str:
+    """Path of the encrypted derivative stored alongside the original blob"""
+    return f"{encrypted_path}.preview-{size}.enc"
+
+def derivative_filename(original_name: str, size: int) -> str:
+    """Download name for a derivative, e.g. report.pdf -> report-128.jpg"""
+    stem = os.path.splitext(original_name)[0] or 'preview'
+    return f"{stem}-{size}.jpg"
+
+def derivative_paths(encrypted_path: str) -> List[str]:
+    """Paths of every configured derivative size for a blob"""
+    return [derivative_path(encrypted_path, size) for size in settings.PREVIEW_SIZES]
+
+def _image_to_thumbnail(image, size: int) -> bytes:
+    from PIL import Image
+
+    image.thumbnail((size, size))
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        # JPEG has no alpha; flatten onto white instead of letting convert() turn it black
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=settings.PREVIEW_JPEG_QUALITY, optimize=True)
+    return output.getvalue()
+
+def _render_image(file_data: bytes, size: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(file_data)) as image:
+        # Draft mode lets JPEG decoding skip straight to a reduced scale
+        image.draft('RGB', (size, size))
+        return _image_to_thumbnail(image, size)
+
+def _render_pdf_first_page(file_data: bytes, size: int) -> bytes:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_data)
+    try:
+        page = pdf[0]
+        width, height = page.get_size()
+        scale = size / max(width, height, 1)
+        image = page.render(scale=scale).to_pil()
+        return _image_to_thumbnail(image, size)
+    finally:
+        pdf.close()
+
+def render_derivative(file_data: bytes, mime_type: str, size: int) -> Optional[bytes]:
+    """Render a JPEG preview no larger than size x size, or None if unsupported"""
+    if mime_type == 'application/pdf':
+        return _render_pdf_first_page(file_data, size)
+    if mime_type.startswith('image/') and is_derivable(mime_type):
+        return _render_image(file_data, size)
+    return None
+
+def save_derivative(data: bytes, path: str) -> str:
+    """Encrypt and save a derivative to disk"""
+    encryption = get_encryption()
+    return encryption.encrypt_file_to_disk(data, path)
+
+def generate_derivatives(file_data: bytes, mime_type: str, encrypted_path: str) -> None:
+    """Render and store every configured preview size for a blob
+
+    Every size is attempted; the first failure is re-raised afterwards so
+    the calling job is retried and its failure recorded.
+    """
+    if not is_derivable(mime_type):
+        return
+
+    error = None
+    for size in settings.PREVIEW_SIZES:
+        try:
+            data = render_derivative(file_data, mime_type, size)
+            if data is not None:
+                save_derivative(data, derivative_path(encrypted_path, size))
+        except Exception as e:
+            logger.exception("Failed to generate %spx preview for %s", size, encrypted_path)
+            error = error or e
+
+    if error is not None:
+        raise error
+
+def delete_derivatives(encrypted_path: str) -> None:
+    """Remove every stored derivative of a blob"""
+    for path in derivative_paths(encrypted_path):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception:
+            pass  # Continue even if file deletion fails
\ No newline at end of file
@@ -1,24 +1,43 @@
 import os
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
+import binascii
+import hmac
+import tempfile
+from functools import lru_cache
+from typing import BinaryIO, Callable, Iterator, Optional
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes, padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.hmac import HMAC
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 
+# Fernet token layout: version (1) | timestamp (8) | IV (16) | ciphertext | HMAC (32)
+FERNET_VERSION = 0x80
+FERNET_HEADER_SIZE = 25
+FERNET_HMAC_SIZE = 32
+
+def derive_key(password: bytes = None) -> bytes:
+    """Derive the Fernet key from the encryption password (PBKDF2, slow by design)"""
+    if password is None:
+        password = os.getenv("ENCRYPTION_KEY", "default-key-change-in-production").encode()
+    
+    salt = b'secureshare_salt'  # In production, use random salt per file
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password))
+
 class FileEncryption:
-    def __init__(self, password: bytes = None):
-        if password is None:
-            password = os.getenv("ENCRYPTION_KEY", "default-key-change-in-production").encode()
-        
-        # Derive key from password
-        salt = b'secureshare_salt'  # In production, use random salt per file
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password))
+    def __init__(self, password: bytes = None, key: bytes = None):
+        if key is None:
+            key = derive_key(password)
         self.cipher = Fernet(key)
+        raw_key = base64.urlsafe_b64decode(key)
+        self._signing_key = raw_key[:16]
+        self._encryption_key = raw_key[16:]
     
     def encrypt_file(self, file_data: bytes) -> bytes:
         """Encrypt file data"""
@@ -29,14 +48,141 @@ class FileEncryption:
         return self.cipher.decrypt(encrypted_data)
     
     def encrypt_file_to_disk(self, file_data: bytes, output_path: str) -> str:
-        """Encrypt and save file to disk"""
+        """Encrypt and save file to disk
+
+        Written to a temporary file in the same directory and renamed into
+        place, so concurrent readers never see a partially written token.
+        """
         encrypted_data = self.encrypt_file(file_data)
-        with open(output_path, 'wb') as f:
-            f.write(encrypted_data)
+        directory, name = os.path.split(output_path)
+        fd, temp_path = tempfile.mkstemp(dir=directory or '.', prefix=f".{name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encrypted_data)
+                # Durable before the caller records or acknowledges it
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, output_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
         return output_path
     
     def decrypt_file_from_disk(self, encrypted_path: str) -> bytes:
         """Read and decrypt file from disk"""
         with open(encrypted_path, 'rb') as f:
             encrypted_data = f.read()
-        return self.decrypt_file(encrypted_data)
\ No newline at end of file
+        return self.decrypt_file(encrypted_data)
+    
+    def _iter_token(self, f: BinaryIO, chunk_size: int, on_read: Optional[Callable[[int], object]] = None) -> Iterator[bytes]:
+        # Tokens are stored base64-encoded; decode in 4-character aligned pieces
+        read_size = max(4, chunk_size // 3 * 4)
+        pending = b''
+        padded = False
+        while True:
+            data = f.read(read_size)
+            if not data:
+                break
+            if on_read is not None:
+                on_read(len(data))
+            pending += data
+            usable = len(pending) - len(pending) % 4
+            if usable:
+                encoded = pending[:usable]
+                # Nothing may follow the padding; b64decode would silently drop
+                # it in one piece but not across pieces
+                significant = encoded.strip()
+                if significant and (padded or b'=' in significant.rstrip(b'=')):
+                    raise InvalidToken
+                padded = padded or significant.endswith(b'=')
+                try:
+                    decoded = base64.urlsafe_b64decode(encoded)
+                except binascii.Error:
+                    raise InvalidToken
+                yield decoded
+                pending = pending[usable:]
+        if pending.strip():
+            raise InvalidToken
+    
+    def decrypt_file_stream(
+        self,
+        encrypted_path: str,
+        chunk_size: int = 64 * 1024,
+        on_read: Optional[Callable[[int], object]] = None
+    ) -> Iterator[bytes]:
+        """Decrypt a file from disk chunk by chunk with bounded memory
+        
+        The HMAC is verified over the whole token in a first pass, so no
+        plaintext is released unless the file is authentic. Both passes
+        read through one descriptor, and the file must be unchanged between
+        them, so what is decrypted is what was authenticated. on_read is
+        called with the size of every disk read, e.g. to charge an I/O budget.
+        """
+        with open(encrypted_path, 'rb') as f:
+            authenticated = os.fstat(f.fileno())
+            
+            # Pass 1: authenticate everything before the trailing HMAC
+            signer = HMAC(self._signing_key, hashes.SHA256())
+            tail = b''
+            total = 0
+            for piece in self._iter_token(f, chunk_size, on_read):
+                total += len(piece)
+                tail += piece
+                if len(tail) > FERNET_HMAC_SIZE:
+                    signer.update(tail[:-FERNET_HMAC_SIZE])
+                    tail = tail[-FERNET_HMAC_SIZE:]
+            if total < FERNET_HEADER_SIZE + FERNET_HMAC_SIZE:
+                raise InvalidToken
+            if not hmac.compare_digest(signer.finalize(), tail):
+                raise InvalidToken
+            
+            current = os.fstat(f.fileno())
+            if (current.st_size, current.st_mtime_ns) != (authenticated.st_size, authenticated.st_mtime_ns):
+                raise InvalidToken
+            
+            # Pass 2: decrypt the authenticated ciphertext
+            f.seek(0)
+            ciphertext_end = total - FERNET_HMAC_SIZE
+            header = b''
+            decryptor = None
+            unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+            offset = 0
+            for piece in self._iter_token(f, chunk_size, on_read):
+                start, offset = offset, offset + len(piece)
+                piece = piece[:max(0, ciphertext_end - start)]
+                if decryptor is None:
+                    header += piece
+                    if len(header) < FERNET_HEADER_SIZE:
+                        continue
+                    if header[0] != FERNET_VERSION:
+                        raise InvalidToken
+                    iv = header[9:FERNET_HEADER_SIZE]
+                    decryptor = Cipher(algorithms.AES(self._encryption_key), modes.CBC(iv)).decryptor()
+                    piece = header[FERNET_HEADER_SIZE:]
+                plaintext = unpadder.update(decryptor.update(piece))
+                if plaintext:
+                    yield plaintext
+            
+            if offset != total:
+                raise InvalidToken
+            try:
+                plaintext = unpadder.update(decryptor.finalize()) + unpadder.finalize()
+            except ValueError:
+                raise InvalidToken
+            if plaintext:
+                yield plaintext
+
+@lru_cache(maxsize=1)
+def get_encryption() -> FileEncryption:
+    """Shared FileEncryption for the process, created on first use
+
+    The production launcher derives the key once and hands it to workers
+    through ENCRYPTION_DERIVED_KEY so they skip PBKDF2 entirely.
+    """
+    derived_key = os.getenv("ENCRYPTION_DERIVED_KEY")
+    if derived_key:
+        return FileEncryption(key=derived_key.encode())
+    return FileEncryption()
\ No newline at end of file
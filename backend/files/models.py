@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from config.database import Base
 
 class FileMetadata(Base):
@@ -16,13 +16,19 @@ class FileMetadata(Base):
     mime_type = Column(String, nullable=False)
     encrypted_path = Column(String, nullable=False)  # Path to encrypted file
     content_hash = Column(String, nullable=False, unique=True)  # IPFS-style hash
-    ai_label = Column(String)
+    ai_label = Column(String)  # Filled in by the background "label" job
+    processing_status = Column(String, server_default="ready")  # pending, ready, failed
     is_private = Column(Boolean, default=True)
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     owner = relationship("User", back_populates="files")
     shares = relationship("FileShare", back_populates="file")
+    
+    __table_args__ = (
+        # Per-user listing and filtered search, newest first
+        Index("ix_files_owner_upload_date", "owner_id", "upload_date"),
+    )
 
 class FileShare(Base):
     __tablename__ = "file_shares"
@@ -38,15 +44,23 @@ class FileShare(Base):
     # Relationships
     file = relationship("FileMetadata", back_populates="shares")
 
+class ListingVersion(Base):
+    __tablename__ = "listing_versions"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # Bumped on every upload/delete
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
 # Pydantic schemas
 class FileUploadResponse(BaseModel):
     id: int
     name: str
     size: int
     hash: str
-    ai_label: str
+    ai_label: Optional[str] = None
     uploaded_at: str
     is_private: bool
+    processing_status: Optional[str] = None
 
 class FileListResponse(BaseModel):
     id: int
@@ -54,12 +68,16 @@ class FileListResponse(BaseModel):
     size: int
     mime_type: str
     hash: str
-    ai_label: str
+    ai_label: Optional[str] = None
     upload_date: str
     is_private: bool
+    processing_status: Optional[str] = None
 
 class FileShareCreate(BaseModel):
     file_id: int
     shared_with_email: Optional[str] = None
     role: str = "viewer"
-    expires_hours: Optional[int] = None
\ No newline at end of file
+    expires_hours: Optional[int] = None
+
+class BulkDownloadRequest(BaseModel):
+    file_ids: List[int]
\ No newline at end of file
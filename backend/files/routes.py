@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from config.database import get_db
 from auth.dependencies import get_current_user
 from files.models import FileMetadata, FileUploadResponse, FileListResponse
 from files.service import (
-    validate_file, generate_content_hash, generate_ai_label,
-    save_encrypted_file, get_user_files, delete_file
+    validate_file, generate_content_hash,
+    save_encrypted_file, get_user_files, delete_file,
+    get_listing_version, bump_listing_version
 )
+from files.search import search_files
+from jobs.service import enqueue_file_processing
+from storage.throttle import transfer_throttle
+from utils.http_cache import make_etag, cache_headers, is_not_modified, not_modified_response
 
 router = APIRouter()
 
@@ -17,13 +24,23 @@ def upload_file(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
+    # One of the user's transfer slots is held until the upload is committed;
+    # hashing, encrypting and fsyncing are where the disk and thread cost is
+    with transfer_throttle.acquire(current_user.id):
+        return store_upload(file, db, current_user)
+
+def store_upload(file: UploadFile, db: Session, current_user) -> dict:
+    """Validate, encrypt and record an upload"""
     # Validate file
     validation_result = validate_file(file)
+    # The body was already received and spooled before this handler ran, so
+    # pacing the read would only park a thread; count it against the user's
+    # share instead so their next transfers are paced
+    transfer_throttle.charge(current_user.id, validation_result['size'])
     file_data = validation_result['data']
     
     # Generate metadata
     content_hash = generate_content_hash(file_data)
-    ai_label = generate_ai_label(file.filename, validation_result['category'])
     
     # Check for duplicates
     existing_file = db.query(FileMetadata).filter(
@@ -48,11 +65,14 @@ def upload_file(
         size=validation_result['size'],
         mime_type=file.content_type,
         encrypted_path=encrypted_path,
-        content_hash=content_hash,
-        ai_label=ai_label
+        content_hash=content_hash
     )
     
+    # Blob is durable; labeling, thumbnails and verification run in jobs.worker
     db.add(file_record)
+    db.flush()
+    enqueue_file_processing(db, file_record)
+    bump_listing_version(db, current_user.id)
     db.commit()
     db.refresh(file_record)
     
@@ -65,29 +85,63 @@ def upload_file(
             "hash": file_record.content_hash,
             "aiLabel": file_record.ai_label,
             "uploadedAt": file_record.upload_date.isoformat(),
-            "isPrivate": file_record.is_private
+            "isPrivate": file_record.is_private,
+            "processingStatus": file_record.processing_status
         }
     }
 
 @router.get("/my", response_model=List[dict])
 def get_my_files(
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
+    # The listing only changes on upload/delete, so its version is the validator
+    version, updated_at = get_listing_version(db, current_user.id)
+    headers = cache_headers(make_etag("files", current_user.id, version), updated_at)
+    if is_not_modified(request, headers["ETag"], updated_at):
+        return not_modified_response(headers)
+    
     files = get_user_files(db, current_user.id)
-    return [
-        {
-            "id": f.id,
-            "name": f.name,
-            "size": f.size,
-            "type": f.mime_type,
-            "hash": f.content_hash,
-            "aiLabel": f.ai_label,
-            "uploadedAt": f.upload_date.isoformat(),
-            "isPrivate": f.is_private
-        }
-        for f in files
-    ]
+    content = [file_to_dict(f) for f in files]
+    return JSONResponse(content=content, headers=headers)
+
+@router.get("/search", response_model=dict)
+def search_my_files(
+    q: Optional[str] = Query(None, max_length=200),
+    type: Optional[str] = Query(None, description="MIME type, or a family such as image/*"),
+    min_size: Optional[int] = Query(None, ge=0),
+    max_size: Optional[int] = Query(None, ge=0),
+    uploaded_after: Optional[datetime] = None,
+    uploaded_before: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    files, has_more = search_files(
+        db, current_user.id, q=q, mime_type=type,
+        min_size=min_size, max_size=max_size,
+        uploaded_after=uploaded_after, uploaded_before=uploaded_before,
+        limit=limit, offset=offset
+    )
+    return {
+        "results": [file_to_dict(f) for f in files],
+        "hasMore": has_more
+    }
+
+def file_to_dict(f: FileMetadata) -> dict:
+    return {
+        "id": f.id,
+        "name": f.name,
+        "size": f.size,
+        "type": f.mime_type,
+        "hash": f.content_hash,
+        "aiLabel": f.ai_label,
+        "uploadedAt": f.upload_date.isoformat(),
+        "isPrivate": f.is_private,
+        "processingStatus": f.processing_status
+    }
 
 @router.delete("/{file_id}")
 def delete_user_file(
@@ -0,0 +1,128 @@
+import re
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import column, inspect, or_, table, text
+from sqlalchemy.orm import Session
+from config.database import engine
+from files.models import FileMetadata
+
+MAX_QUERY_TERMS = 10
+
+files_fts = table("files_fts", column("rowid"))
+
+# SQLite: FTS5 table kept in sync by triggers. The owner column holds "u<id>"
+# so per-user searches intersect posting lists instead of scanning all matches.
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+        owner, name, original_name, ai_label,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS files_fts_insert AFTER INSERT ON files BEGIN
+        INSERT INTO files_fts (rowid, owner, name, original_name, ai_label)
+        VALUES (new.id, 'u' || new.owner_id, new.name, new.original_name, coalesce(new.ai_label, ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS files_fts_delete AFTER DELETE ON files BEGIN
+        DELETE FROM files_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS files_fts_update AFTER UPDATE OF owner_id, name, original_name, ai_label ON files BEGIN
+        DELETE FROM files_fts WHERE rowid = old.id;
+        INSERT INTO files_fts (rowid, owner, name, original_name, ai_label)
+        VALUES (new.id, 'u' || new.owner_id, new.name, new.original_name, coalesce(new.ai_label, ''));
+    END""",
+]
+
+SQLITE_FTS_BACKFILL = """INSERT INTO files_fts (rowid, owner, name, original_name, ai_label)
+    SELECT id, 'u' || owner_id, name, original_name, coalesce(ai_label, '') FROM files"""
+
+# PostgreSQL: generated tsvector column with a GIN index
+POSTGRES_FTS_DDL = [
+    """ALTER TABLE files ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple',
+            coalesce(name, '') || ' ' || coalesce(original_name, '') || ' ' || coalesce(ai_label, '')
+        )) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_files_search_vector ON files USING GIN (search_vector)",
+]
+
+def init_search_index() -> None:
+    """Create the full-text index for the current database and backfill it"""
+    with engine.begin() as connection:
+        # create_all only builds indexes with new tables
+        for index in FileMetadata.__table__.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+        if engine.dialect.name == "sqlite":
+            is_new = not inspect(connection).has_table("files_fts")
+            for ddl in SQLITE_FTS_DDL:
+                connection.execute(text(ddl))
+            if is_new:
+                connection.execute(text(SQLITE_FTS_BACKFILL))
+        elif engine.dialect.name == "postgresql":
+            for ddl in POSTGRES_FTS_DDL:
+                connection.execute(text(ddl))
+
+def query_terms(q: str) -> List[str]:
+    """Split a user query into lower-cased word terms"""
+    return re.findall(r"\w+", (q or "").lower())[:MAX_QUERY_TERMS]
+
+def search_files(
+    db: Session,
+    user_id: int,
+    q: str = None,
+    mime_type: str = None,
+    min_size: int = None,
+    max_size: int = None,
+    uploaded_after: datetime = None,
+    uploaded_before: datetime = None,
+    limit: int = 50,
+    offset: int = 0
+) -> Tuple[List[FileMetadata], bool]:
+    """Search a user's files by name/label with filters; returns (page, has_more)"""
+    query = db.query(FileMetadata).filter(FileMetadata.owner_id == user_id)
+
+    if mime_type:
+        if mime_type.endswith("/*"):
+            query = query.filter(FileMetadata.mime_type.like(mime_type[:-1] + "%"))
+        else:
+            query = query.filter(FileMetadata.mime_type == mime_type)
+    if min_size is not None:
+        query = query.filter(FileMetadata.size >= min_size)
+    if max_size is not None:
+        query = query.filter(FileMetadata.size <= max_size)
+    if uploaded_after is not None:
+        query = query.filter(FileMetadata.upload_date >= uploaded_after)
+    if uploaded_before is not None:
+        query = query.filter(FileMetadata.upload_date < uploaded_before)
+
+    terms = query_terms(q)
+    dialect = db.get_bind().dialect.name
+    if terms and dialect == "sqlite":
+        # Every term is a prefix match against any of the text columns
+        match = f'owner : "u{int(user_id)}" AND {{name original_name ai_label}} : (' + " ".join(
+            f'"{term}"*' for term in terms
+        ) + ")"
+        # Newest first: FTS5 streams matches in rowid order and stops at the
+        # page limit instead of ranking every match
+        query = query.join(files_fts, files_fts.c.rowid == FileMetadata.id).filter(
+            text("files_fts MATCH :match").bindparams(match=match)
+        ).order_by(files_fts.c.rowid.desc())
+    elif terms and dialect == "postgresql":
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        query = query.filter(
+            text("files.search_vector @@ to_tsquery('simple', :tsquery)").bindparams(tsquery=tsquery)
+        ).order_by(FileMetadata.id.desc())
+    elif terms:
+        for term in terms:
+            pattern = f"%{term}%"
+            query = query.filter(or_(
+                FileMetadata.name.ilike(pattern),
+                FileMetadata.original_name.ilike(pattern),
+                FileMetadata.ai_label.ilike(pattern)
+            ))
+        query = query.order_by(FileMetadata.id.desc())
+    else:
+        query = query.order_by(FileMetadata.upload_date.desc(), FileMetadata.id.desc())
+
+    # Fetch one extra row to report whether another page exists without a COUNT
+    rows = query.offset(offset).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
\ No newline at end of file
@@ -1,10 +1,14 @@
 import hashlib
 import os
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
 from sqlalchemy.orm import Session
-from files.models import FileMetadata
-from files.encryption import FileEncryption
+from sqlalchemy import or_
+from files.models import FileMetadata, FileShare, ListingVersion
+from files.encryption import get_encryption
+from files.derivatives import delete_derivatives, derivative_paths
+from storage.cache import preview_cache
 from config.settings import settings
 
 # Allowed MIME types matching frontend
@@ -49,7 +53,10 @@ def validate_file(file: UploadFile) -> Dict[str, Any]:
 
 def generate_content_hash(file_data: bytes) -> str:
     """Generate IPFS-style content hash"""
-    sha256_hash = hashlib.sha256(file_data).hexdigest()
+    return format_content_hash(hashlib.sha256(file_data).hexdigest())
+
+def format_content_hash(sha256_hash: str) -> str:
+    """Format a SHA-256 hex digest as a content hash"""
     # IPFS-style hash: Qm + first 44 chars of hash
     return f"Qm{sha256_hash[:44]}"
 
@@ -87,6 +94,45 @@ def generate_ai_label(filename: str, category: str) -> str:
     category_labels = label_map.get(category, ['File'])
     return random.choice(category_labels)
 
+# Content keywords checked before falling back to filename/category labels
+CONTENT_LABELS = [
+    (('invoice', 'amount due', 'bill to'), '💰 Invoice'),
+    (('agreement', 'hereinafter', 'terms and conditions'), '📋 Contract/Agreement'),
+    (('balance sheet', 'revenue', 'fiscal year'), '📊 Financial Report'),
+    (('work experience', 'curriculum vitae', 'education'), '👔 Resume/CV'),
+]
+
+TEXT_SAMPLE_SIZE = 64 * 1024
+
+def extract_text_sample(file_data: bytes, mime_type: str) -> str:
+    """Extract lower-cased text from the start of a document, if it has any"""
+    if mime_type == 'text/plain':
+        return file_data[:TEXT_SAMPLE_SIZE].decode('utf-8', errors='ignore').lower()
+    
+    if mime_type == 'application/pdf':
+        import pypdfium2 as pdfium
+        
+        pdf = pdfium.PdfDocument(file_data)
+        try:
+            if len(pdf) == 0:
+                return ''
+            textpage = pdf[0].get_textpage()
+            return textpage.get_text_range()[:TEXT_SAMPLE_SIZE].lower()
+        finally:
+            pdf.close()
+    
+    return ''
+
+def classify_file(file_data: bytes, filename: str, mime_type: str) -> str:
+    """Generate AI label from file content, falling back to filename and category"""
+    text = extract_text_sample(file_data, mime_type)
+    for keywords, label in CONTENT_LABELS:
+        if any(keyword in text for keyword in keywords):
+            return label
+    
+    category = ALLOWED_MIME_TYPES.get(mime_type, {}).get('category', 'File')
+    return generate_ai_label(filename, category)
+
 def save_encrypted_file(file_data: bytes, filename: str, user_id: int) -> str:
     """Save file with encryption"""
     # Generate unique filename
@@ -95,7 +141,7 @@ def save_encrypted_file(file_data: bytes, filename: str, user_id: int) -> str:
     encrypted_path = settings.UPLOAD_DIR / encrypted_filename
     
     # Encrypt and save
-    encryption = FileEncryption()
+    encryption = get_encryption()
     encryption.encrypt_file_to_disk(file_data, str(encrypted_path))
     
     return str(encrypted_path)
@@ -104,6 +150,23 @@ def get_user_files(db: Session, user_id: int):
     """Get all files for a user"""
     return db.query(FileMetadata).filter(FileMetadata.owner_id == user_id).all()
 
+def get_listing_version(db: Session, user_id: int) -> Tuple[int, Optional[datetime]]:
+    """Get the current listing version and when it last changed"""
+    row = db.query(ListingVersion).filter(ListingVersion.user_id == user_id).first()
+    if not row:
+        return 0, None
+    return row.version, row.updated_at
+
+def bump_listing_version(db: Session, user_id: int) -> None:
+    """Mark a user's file listing as changed (committed with the caller's transaction)"""
+    now = datetime.now(timezone.utc)
+    updated = db.query(ListingVersion).filter(ListingVersion.user_id == user_id).update(
+        {ListingVersion.version: ListingVersion.version + 1, ListingVersion.updated_at: now},
+        synchronize_session=False
+    )
+    if not updated:
+        db.add(ListingVersion(user_id=user_id, version=1, updated_at=now))
+
 def get_file_by_id(db: Session, file_id: int, user_id: int):
     """Get specific file owned by user"""
     return db.query(FileMetadata).filter(
@@ -111,20 +174,49 @@ def get_file_by_id(db: Session, file_id: int, user_id: int):
         FileMetadata.owner_id == user_id
     ).first()
 
+def get_accessible_files(db: Session, file_ids: List[int], user_id: int, email: str) -> List[FileMetadata]:
+    """Get files the user owns or that are shared with them (unexpired), in request order"""
+    now = datetime.utcnow()
+    shared_ids = db.query(FileShare.file_id).filter(
+        FileShare.shared_with_email == email,
+        or_(FileShare.expires_at.is_(None), FileShare.expires_at > now)
+    )
+    files = db.query(FileMetadata).filter(
+        FileMetadata.id.in_(file_ids),
+        or_(FileMetadata.owner_id == user_id, FileMetadata.id.in_(shared_ids))
+    ).all()
+    by_id = {f.id: f for f in files}
+    return [by_id[file_id] for file_id in dict.fromkeys(file_ids) if file_id in by_id]
+
 def delete_file(db: Session, file_id: int, user_id: int) -> bool:
     """Delete file and its encrypted data"""
     file_record = get_file_by_id(db, file_id, user_id)
     if not file_record:
         return False
     
+    # jobs.service imports this module
+    from jobs.service import cancel_file_jobs
+    
+    encrypted_path = file_record.encrypted_path
+    
+    # Delete from database first, cancelling any unfinished processing jobs;
+    # a job still running re-checks the row before writing derivatives
+    cancel_file_jobs(db, file_id)
+    db.delete(file_record)
+    bump_listing_version(db, user_id)
+    db.commit()
+    
+    # Drop any decrypted copies held for previews
+    preview_cache.invalidate(encrypted_path)
+    for path in derivative_paths(encrypted_path):
+        preview_cache.invalidate(path)
+    delete_derivatives(encrypted_path)
+    
     # Delete encrypted file from disk
     try:
-        if os.path.exists(file_record.encrypted_path):
-            os.remove(file_record.encrypted_path)
+        if os.path.exists(encrypted_path):
+            os.remove(encrypted_path)
     except Exception:
         pass  # Continue even if file deletion fails
     
-    # Delete from database
-    db.delete(file_record)
-    db.commit()
     return True
\ No newline at end of file
@@ -0,0 +1,18 @@
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"  # File deleted before the job finished
+
+class ProcessingStatus(str, Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+class JobPriority(int, Enum):
+    LOW = 0
+    NORMAL = 5
+    HIGH = 10
\ No newline at end of file
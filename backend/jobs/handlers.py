@@ -0,0 +1,58 @@
+from typing import Any, Callable, Dict
+from sqlalchemy.orm import Session
+from files.models import FileMetadata
+from files.encryption import get_encryption
+from files.derivatives import generate_derivatives, delete_derivatives
+from files.service import classify_file, generate_content_hash, bump_listing_version
+
+def _load_file(db: Session, file_id: int):
+    file_record = db.query(FileMetadata).filter(FileMetadata.id == file_id).first()
+    if not file_record:
+        return None, None
+    file_data = get_encryption().decrypt_file_from_disk(file_record.encrypted_path)
+    return file_record, file_data
+
+def _file_deleted(db: Session, file_id: int) -> bool:
+    # Re-checked after slow work; delete_file commits before removing blobs
+    return db.query(FileMetadata.id).filter(FileMetadata.id == file_id).first() is None
+
+def label_file(db: Session, file_id: int, payload: Dict[str, Any]) -> None:
+    """Classify the file content and store ai_label"""
+    file_record, file_data = _load_file(db, file_id)
+    if not file_record:
+        return  # Deleted while queued
+    
+    ai_label = classify_file(file_data, file_record.original_name, file_record.mime_type)
+    if _file_deleted(db, file_id):
+        return
+    
+    file_record.ai_label = ai_label
+    bump_listing_version(db, file_record.owner_id)
+    db.commit()
+
+def render_derivatives(db: Session, file_id: int, payload: Dict[str, Any]) -> None:
+    """Render and store preview thumbnails"""
+    file_record, file_data = _load_file(db, file_id)
+    if not file_record:
+        return
+    
+    generate_derivatives(file_data, file_record.mime_type, file_record.encrypted_path)
+    if _file_deleted(db, file_id):
+        # Deleted while rendering; don't leave previews behind
+        delete_derivatives(file_record.encrypted_path)
+
+def verify_file(db: Session, file_id: int, payload: Dict[str, Any]) -> None:
+    """Check the stored blob decrypts and matches its content hash"""
+    file_record, file_data = _load_file(db, file_id)
+    if not file_record:
+        return
+    
+    if generate_content_hash(file_data) != file_record.content_hash:
+        raise ValueError(f"Content hash mismatch for file {file_id}")
+
+# Job kind -> handler(db, file_id, payload)
+HANDLERS: Dict[str, Callable[[Session, int, Dict[str, Any]], None]] = {
+    "label": label_file,
+    "derivatives": render_derivatives,
+    "verify": verify_file,
+}
\ No newline at end of file
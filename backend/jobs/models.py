@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from config.database import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # Handler name, see jobs.handlers
+    payload = Column(Text, nullable=False, default="{}")  # JSON
+    file_id = Column(Integer, ForeignKey("files.id", ondelete="CASCADE"), index=True)
+    status = Column(String, nullable=False, default="queued")
+    priority = Column(Integer, nullable=False, default=5)  # Higher runs first
+    idempotency_key = Column(String, unique=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), server_default=func.now())
+    locked_by = Column(String)
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        # Claim query: next runnable job by priority
+        Index("ix_jobs_claim", "status", "priority", "run_after"),
+    )
\ No newline at end of file
@@ -0,0 +1,154 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from jobs.models import Job
+from jobs.enums import JobStatus, JobPriority, ProcessingStatus
+from files.models import FileMetadata
+from files.derivatives import is_derivable
+from files.service import bump_listing_version
+from config.settings import settings
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any] = None,
+    file_id: int = None,
+    priority: int = JobPriority.NORMAL,
+    idempotency_key: str = None,
+    max_attempts: int = None
+) -> Job:
+    """Queue a job in the caller's transaction; a repeated idempotency key returns the existing job"""
+    if idempotency_key:
+        existing = db.query(Job).filter(Job.idempotency_key == idempotency_key).first()
+        if existing:
+            return existing
+
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        file_id=file_id,
+        status=JobStatus.QUEUED.value,
+        priority=int(priority),
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow()
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+def enqueue_file_processing(db: Session, file_record: FileMetadata) -> None:
+    """Queue the post-upload jobs for a file and mark it pending"""
+    file_record.processing_status = ProcessingStatus.PENDING.value
+    enqueue_job(db, "label", file_id=file_record.id, priority=JobPriority.HIGH,
+                idempotency_key=f"label:{file_record.id}")
+    if is_derivable(file_record.mime_type):
+        enqueue_job(db, "derivatives", file_id=file_record.id, priority=JobPriority.NORMAL,
+                    idempotency_key=f"derivatives:{file_record.id}")
+    enqueue_job(db, "verify", file_id=file_record.id, priority=JobPriority.LOW,
+                idempotency_key=f"verify:{file_record.id}")
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Job]:
+    """Atomically take the highest-priority runnable job, or None"""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+
+    # A few tries in case another worker wins the race for the same row
+    for _ in range(5):
+        candidate = db.query(Job.id).filter(
+            or_(
+                (Job.status == JobStatus.QUEUED.value) & (Job.run_after <= now),
+                # Jobs held by a worker that died mid-run
+                (Job.status == JobStatus.RUNNING.value) & (Job.locked_at < stale_before)
+            )
+        ).order_by(Job.priority.desc(), Job.id).first()
+        if candidate is None:
+            return None
+
+        claimed = db.query(Job).filter(
+            Job.id == candidate.id,
+            or_(
+                Job.status == JobStatus.QUEUED.value,
+                (Job.status == JobStatus.RUNNING.value) & (Job.locked_at < stale_before)
+            )
+        ).update({
+            Job.status: JobStatus.RUNNING.value,
+            Job.locked_by: worker_id,
+            Job.locked_at: now,
+            Job.attempts: Job.attempts + 1
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return db.query(Job).filter(Job.id == candidate.id).first()
+    return None
+
+def _finish_running(db: Session, job_id: int, values: Dict[Any, Any]) -> bool:
+    # Only a job that is still running is updated, so a cancellation made
+    # while it ran is never overwritten
+    updated = db.query(Job).filter(
+        Job.id == job_id,
+        Job.status == JobStatus.RUNNING.value
+    ).update(values, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+def complete_job(db: Session, job_id: int) -> bool:
+    """Mark a running job done; returns False if it was cancelled meanwhile"""
+    return _finish_running(db, job_id, {
+        Job.status: JobStatus.DONE.value,
+        Job.locked_by: None,
+        Job.finished_at: datetime.utcnow(),
+        Job.last_error: None
+    })
+
+def fail_job(db: Session, job_id: int, attempts: int, max_attempts: int, error: str) -> bool:
+    """Record a failure and schedule a retry with exponential backoff"""
+    values = {Job.last_error: error, Job.locked_by: None}
+    if attempts >= max_attempts:
+        values[Job.status] = JobStatus.FAILED.value
+        values[Job.finished_at] = datetime.utcnow()
+    else:
+        delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+        values[Job.status] = JobStatus.QUEUED.value
+        values[Job.run_after] = datetime.utcnow() + timedelta(seconds=delay)
+    return _finish_running(db, job_id, values)
+
+def cancel_file_jobs(db: Session, file_id: int) -> None:
+    """Cancel a file's unfinished jobs in the caller's transaction
+
+    Rows are kept (a worker may be running one) but detached from the file,
+    so the files.id cascade leaves them alone and a reused file id can
+    enqueue again under the same idempotency key.
+    """
+    db.query(Job).filter(
+        Job.file_id == file_id,
+        Job.status.in_([JobStatus.QUEUED.value, JobStatus.RUNNING.value])
+    ).update({
+        Job.status: JobStatus.CANCELLED.value,
+        Job.finished_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.query(Job).filter(Job.file_id == file_id).update({
+        Job.file_id: None,
+        Job.idempotency_key: None
+    }, synchronize_session=False)
+
+def refresh_processing_status(db: Session, file_id: int) -> None:
+    """Derive a file's processing_status from its jobs"""
+    file_record = db.query(FileMetadata).filter(FileMetadata.id == file_id).first()
+    if not file_record:
+        return
+
+    statuses = {status for (status,) in db.query(Job.status).filter(Job.file_id == file_id)}
+    if JobStatus.FAILED.value in statuses:
+        status = ProcessingStatus.FAILED.value
+    elif statuses <= {JobStatus.DONE.value}:
+        status = ProcessingStatus.READY.value
+    else:
+        status = ProcessingStatus.PENDING.value
+
+    if file_record.processing_status != status:
+        file_record.processing_status = status
+        bump_listing_version(db, file_record.owner_id)
+        db.commit()
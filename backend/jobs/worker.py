@@ -0,0 +1,103 @@
+"""
+Background job worker
+Run alongside the API server to process queued jobs:
+
+    python -m jobs.worker                 # one worker process
+    python -m jobs.worker --processes 4
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+from config.database import SessionLocal, register_models
+from config.settings import settings
+from jobs.handlers import HANDLERS
+from jobs.service import claim_next_job, complete_job, fail_job, refresh_processing_status
+
+logger = logging.getLogger("jobs.worker")
+
+def run_job(db, job) -> None:
+    """Execute one claimed job and record the outcome"""
+    # Plain values: handlers commit, and the row may be cancelled meanwhile
+    job_id, kind, file_id = job.id, job.kind, job.file_id
+    attempts, max_attempts = job.attempts, job.max_attempts
+    handler = HANDLERS.get(kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        handler(db, file_id, json.loads(job.payload or "{}"))
+        finished = complete_job(db, job_id)
+    except Exception:
+        db.rollback()
+        logger.exception("Job %s (%s) failed on attempt %s", job_id, kind, attempts)
+        finished = fail_job(db, job_id, attempts, max_attempts, traceback.format_exc(limit=5))
+
+    if not finished:
+        logger.info("Job %s (%s) was cancelled while running", job_id, kind)
+    elif file_id is not None:
+        refresh_processing_status(db, file_id)
+
+def run_worker(worker_id: str = None) -> None:
+    """Poll for jobs until SIGTERM/SIGINT; the current job always finishes first"""
+    # Also runs in spawned child processes, which start with no models imported
+    register_models()
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    logger.info("Worker %s started", worker_id)
+    while not stopping:
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, worker_id)
+            if job is not None:
+                run_job(db, job)
+        except Exception:
+            logger.exception("Worker %s could not claim a job", worker_id)
+            job = None
+        finally:
+            db.close()
+
+        if job is None:
+            time.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+    logger.info("Worker %s stopped", worker_id)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SecureShare background job workers")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKERS, help="Number of worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    if args.processes <= 1:
+        run_worker()
+        return
+
+    processes = [multiprocessing.Process(target=run_worker) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def forward_stop(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward_stop)
+    signal.signal(signal.SIGINT, forward_stop)
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,19 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from config.database import engine, Base
+from config.database import engine, init_db
 from config.settings import settings
 from auth.routes import router as auth_router
 from files.routes import router as files_router
 from storage.routes import router as storage_router
 from middleware.cors import add_cors_middleware
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The production launcher migrates once up front and disables this per worker
+    if settings.AUTO_MIGRATE:
+        init_db()
+    yield
+    # In-flight requests have drained by now; release pooled connections
+    engine.dispose()
 
 app = FastAPI(
     title="SecureShare Backend",
     description="Privacy-first file sharing with encryption",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
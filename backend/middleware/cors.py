@@ -8,4 +8,5 @@ def add_cors_middleware(app):
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Last-Modified", "Content-Disposition"],
     )
\ No newline at end of file
@@ -1,22 +1,107 @@
 #!/usr/bin/env python3
 """
 SecureShare Backend Startup Script
-Run this to start the development server
+Run this to start the development server, or with --prod for production:
+
+    python start.py                    # single process with auto-reload
+    python start.py --prod             # multi-worker, no reload
+    python start.py --prod --workers 8
+    python start.py --check-startup    # fail if import time exceeds the budget
+
+Both modes also run the background job workers (jobs.worker) and, when
+SCRUB_ENABLED is set, the integrity scrubber (storage.scrubber).
 """
 
+import argparse
+import signal
 import subprocess
 import sys
 import os
 from pathlib import Path
 
+# Run in a fresh interpreter to measure what each worker pays on start
+STARTUP_PROBE = (
+    "import time; start = time.perf_counter(); import main; "
+    "print(time.perf_counter() - start)"
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the SecureShare backend")
+    parser.add_argument("--prod", action="store_true", help="Run multi-worker production server")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (production only)")
+    parser.add_argument("--host", help="Bind address")
+    parser.add_argument("--port", type=int, help="Bind port")
+    parser.add_argument("--job-workers", type=int, help="Number of background job processes (0 to disable)")
+    parser.add_argument("--check-startup", action="store_true", help="Measure startup time against the budget and exit")
+    return parser.parse_args()
+
+def measure_startup(env) -> float:
+    """Seconds a fresh worker takes to import main:app"""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def worker_env():
+    """Environment for workers: no migrations on startup, key derived once here"""
+    from files.encryption import derive_key
+
+    env = os.environ.copy()
+    env["AUTO_MIGRATE"] = "false"
+    env["ENCRYPTION_DERIVED_KEY"] = derive_key().decode()
+    return env
+
+def prepare_production_env():
+    """Run one-time work in the launcher and return the environment for workers"""
+    from config.database import init_db
+
+    print("🗄️  Running database migrations...")
+    init_db()
+    # Workers skip create_all and PBKDF2; both were done once here
+    return worker_env()
+
+def check_startup_budget(env, budget: float) -> bool:
+    elapsed = measure_startup(env)
+    if elapsed > budget:
+        print(f"⚠️  Worker startup took {elapsed:.2f}s (budget {budget:.2f}s)")
+        return False
+    print(f"⏱️  Worker startup took {elapsed:.2f}s (budget {budget:.2f}s)")
+    return True
+
+def run_supervised(commands, env=None):
+    """Run the server and job workers together; SIGTERM/SIGINT is passed to each
+    so uvicorn drains in-flight requests and workers finish their current job"""
+    processes = [subprocess.Popen(command, env=env) for command in commands]
+
+    def forward_stop(signum, frame):
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward_stop)
+    # Ctrl+C already reaches every child through the terminal; a second
+    # signal would make uvicorn skip the graceful drain
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        # The server exiting (or dying) takes the workers down with it
+        processes[0].wait()
+    finally:
+        forward_stop(None, None)
+        for process in processes:
+            process.wait()
+
 def main():
+    args = parse_args()
+
     # Change to backend directory
     backend_dir = Path(__file__).parent
     os.chdir(backend_dir)
-    
+    sys.path.insert(0, str(backend_dir))
+
     print("🚀 Starting SecureShare Backend...")
     print("📁 Working directory:", backend_dir)
-    
+
     # Check if .env exists
     if not Path(".env").exists():
         print("⚠️  .env file not found. Creating from template...")
@@ -26,7 +111,7 @@ def main():
             print("✅ Created .env file from template")
         else:
             print("❌ .env.example not found")
-    
+
     # Install dependencies if needed
     try:
         import fastapi
@@ -34,21 +119,54 @@ def main():
     except ImportError:
         print("📦 Installing dependencies...")
         subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-    
-    # Start server
-    print("🌐 Starting server at http://localhost:8000")
-    print("📚 API docs at http://localhost:8000/docs")
-    
-    try:
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "main:app", 
-            "--reload", 
-            "--host", "0.0.0.0", 
-            "--port", "8000"
-        ])
-    except KeyboardInterrupt:
-        print("\n👋 Server stopped")
+
+    from config.settings import settings
+    host = args.host or settings.HOST
+    port = args.port or settings.PORT
+
+    if args.check_startup:
+        # Measures what a worker pays on import; never touches the database
+        env = worker_env()
+        sys.exit(0 if check_startup_budget(env, settings.STARTUP_BUDGET_SECONDS) else 1)
+
+    job_workers = settings.JOB_WORKERS if args.job_workers is None else args.job_workers
+    worker_command = [sys.executable, "-m", "jobs.worker", "--processes", str(job_workers)]
+
+    if args.prod:
+        workers = args.workers or settings.WORKERS
+        env = prepare_production_env()
+        check_startup_budget(env, settings.STARTUP_BUDGET_SECONDS)
+        command = [
+            sys.executable, "-m", "uvicorn",
+            "main:app",
+            "--host", host,
+            "--port", str(port),
+            "--workers", str(workers),
+            "--timeout-graceful-shutdown", str(settings.GRACEFUL_SHUTDOWN_SECONDS)
+        ]
+        print(f"🌐 Starting {workers} workers at http://{host}:{port}")
+    else:
+        env = None
+        command = [
+            sys.executable, "-m", "uvicorn",
+            "main:app",
+            "--reload",
+            "--host", host,
+            "--port", str(port)
+        ]
+        print(f"🌐 Starting server at http://localhost:{port}")
+        print(f"📚 API docs at http://localhost:{port}/docs")
+
+    commands = [command]
+    if job_workers > 0:
+        print(f"⚙️  Starting {job_workers} background job workers")
+        commands.append(worker_command)
+    if settings.SCRUB_ENABLED:
+        print("🔍 Starting integrity scrubber")
+        commands.append([sys.executable, "-m", "storage.scrubber"])
+
+    run_supervised(commands, env)
+    print("\n👋 Server stopped")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
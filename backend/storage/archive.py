@@ -0,0 +1,83 @@
+import os
+import zipfile
+from datetime import datetime
+from typing import Iterable, Iterator, List, Set
+from files.models import FileMetadata
+from files.encryption import get_encryption
+from config.settings import settings
+
+# Already-compressed formats are stored as-is; deflating them only burns CPU
+COMPRESSIBLE_MIME_TYPES = {'text/plain', 'application/msword', 'application/vnd.ms-excel'}
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that collects what zipfile writes"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        if data:
+            self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self.chunks = self.chunks, []
+        return iter(chunks)
+
+def _unique_name(name: str, used: Set[str]) -> str:
+    name = name.replace('/', '_').replace('\\', '_') or 'file'
+    candidate = name
+    stem, ext = os.path.splitext(name)
+    counter = 1
+    while candidate.lower() in used:
+        candidate = f"{stem} ({counter}){ext}"
+        counter += 1
+    used.add(candidate.lower())
+    return candidate
+
+def _zip_date_time(value: datetime):
+    # ZIP timestamps cannot predate 1980
+    if value is None or value.year < 1980:
+        value = datetime(1980, 1, 1)
+    return value.timetuple()[:6]
+
+def stream_zip(file_records: Iterable[FileMetadata]) -> Iterator[bytes]:
+    """Build a ZIP archive on the fly, decrypting each blob chunk by chunk
+
+    Nothing is buffered beyond one chunk per entry: zipfile writes data
+    descriptors because the sink cannot seek, and ZIP64 records are
+    added automatically for large entries or archives.
+    """
+    encryption = get_encryption()
+    sink = _ChunkSink()
+    used_names: Set[str] = set()
+
+    with zipfile.ZipFile(sink, mode='w', allowZip64=True) as archive:
+        for file_record in file_records:
+            # Authenticates the whole blob before the entry header is written
+            plaintext = encryption.decrypt_file_stream(file_record.encrypted_path, settings.ZIP_CHUNK_SIZE)
+            first_chunk = next(plaintext, b'')
+
+            info = zipfile.ZipInfo(
+                _unique_name(file_record.original_name, used_names),
+                date_time=_zip_date_time(file_record.upload_date)
+            )
+            info.file_size = file_record.size  # Lets zipfile decide on ZIP64 up front
+            if file_record.mime_type in COMPRESSIBLE_MIME_TYPES:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            else:
+                info.compress_type = zipfile.ZIP_STORED
+
+            with archive.open(info, mode='w', force_zip64=file_record.size >= zipfile.ZIP64_LIMIT) as entry:
+                entry.write(first_chunk)
+                yield from sink.drain()
+                for chunk in plaintext:
+                    entry.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+
+    # Central directory
+    yield from sink.drain()
\ No newline at end of file
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings
+
+class DecryptedChunkCache:
+    """Byte-budgeted LRU cache of decrypted blob chunks
+
+    Entries are keyed by (blob path, chunk index) and held in bytearrays so
+    they can be zeroed in place when evicted, expired or invalidated. The
+    cache is per-process; each worker keeps its own copy.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: int, chunk_size: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.chunk_size = chunk_size
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[bytearray, float]]" = OrderedDict()
+        self._chunk_counts: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'rejected': 0
+        }
+
+    def get_blob(self, blob_path: str) -> Optional[List[bytes]]:
+        """Return all decrypted chunks of a blob, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            count = self._chunk_counts.get(blob_path)
+            if count is None:
+                self._stats['misses'] += 1
+                return None
+
+            now = time.monotonic()
+            chunks = []
+            for index in range(count):
+                entry = self._entries.get((blob_path, index))
+                if entry is None or entry[1] <= now:
+                    # A partial or stale blob is useless; drop what is left
+                    if entry is not None:
+                        self._stats['expirations'] += 1
+                    self._drop_blob(blob_path)
+                    self._stats['misses'] += 1
+                    return None
+                chunks.append(entry[0])
+
+            for index in range(count):
+                self._entries.move_to_end((blob_path, index))
+            self._stats['hits'] += 1
+            # Copy out so callers never see a buffer that is zeroed later
+            return [bytes(chunk) for chunk in chunks]
+
+    def put_blob(self, blob_path: str, data: bytes) -> bool:
+        """Split decrypted data into chunks and cache them"""
+        if not self.enabled:
+            return False
+
+        if len(data) > self.max_bytes:
+            with self._lock:
+                self._stats['rejected'] += 1
+            return False
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        chunks = [
+            bytearray(data[offset:offset + self.chunk_size])
+            for offset in range(0, max(len(data), 1), self.chunk_size)
+        ]
+
+        with self._lock:
+            self._drop_blob(blob_path)
+            for index, chunk in enumerate(chunks):
+                self._entries[(blob_path, index)] = (chunk, expires_at)
+                self._bytes += len(chunk)
+            self._chunk_counts[blob_path] = len(chunks)
+            self._evict_to_budget()
+        return True
+
+    def invalidate(self, blob_path: str) -> None:
+        """Remove and zero every cached chunk of a blob"""
+        with self._lock:
+            if blob_path in self._chunk_counts:
+                self._drop_blob(blob_path)
+                self._stats['invalidations'] += 1
+
+    def clear(self) -> None:
+        """Remove and zero every cached chunk"""
+        with self._lock:
+            for blob_path in list(self._chunk_counts):
+                self._drop_blob(blob_path)
+
+    def stats(self) -> dict:
+        """Return cache counters and current usage"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'blobs': len(self._chunk_counts),
+                'chunks': len(self._entries),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                **self._stats
+            }
+
+    def _evict_to_budget(self) -> None:
+        now = time.monotonic()
+        for key, (_, expires_at) in list(self._entries.items()):
+            if expires_at <= now and key[0] in self._chunk_counts:
+                self._drop_blob(key[0])
+                self._stats['expirations'] += 1
+
+        # The blob just inserted sits at the MRU end, so it is evicted last
+        while self._bytes > self.max_bytes and len(self._chunk_counts) > 1:
+            self._drop_blob(next(iter(self._entries))[0])
+            self._stats['evictions'] += 1
+
+    def _drop_blob(self, blob_path: str) -> None:
+        count = self._chunk_counts.pop(blob_path, 0)
+        for index in range(count):
+            entry = self._entries.pop((blob_path, index), None)
+            if entry is not None:
+                chunk = entry[0]
+                self._bytes -= len(chunk)
+                chunk[:] = bytes(len(chunk))
+
+preview_cache = DecryptedChunkCache(
+    max_bytes=settings.PREVIEW_CACHE_MAX_BYTES,
+    ttl_seconds=settings.PREVIEW_CACHE_TTL_SECONDS,
+    chunk_size=settings.PREVIEW_CACHE_CHUNK_SIZE,
+    enabled=settings.PREVIEW_CACHE_ENABLED
+)
\ No newline at end of file
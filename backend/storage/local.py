@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 from storage.interface import StorageInterface
-from files.encryption import FileEncryption
+from files.encryption import FileEncryption, get_encryption
 from config.settings import settings
 
 class LocalStorage(StorageInterface):
@@ -9,8 +9,12 @@ class LocalStorage(StorageInterface):
     
     def __init__(self):
         self.storage_dir = settings.UPLOAD_DIR
-        self.encryption = FileEncryption()
-        
+    
+    @property
+    def encryption(self) -> FileEncryption:
+        # Resolved lazily so importing the routes does not run PBKDF2
+        return get_encryption()
+    
     def store_file(self, file_data: bytes, file_id: str) -> str:
         """Store encrypted file locally"""
         file_path = self.storage_dir / f"{file_id}.enc"
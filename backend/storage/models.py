@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from config.database import Base
+
+class ScrubState(Base):
+    __tablename__ = "scrub_state"
+    
+    id = Column(Integer, primary_key=True)  # Single row
+    cursor = Column(Integer, nullable=False, default=0)  # Last FileMetadata.id checked
+    pass_started_at = Column(DateTime(timezone=True))
+    last_pass_finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ScrubFinding(Base):
+    __tablename__ = "scrub_findings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # missing_blob, undecryptable, hash_mismatch, orphan_blob
+    file_id = Column(Integer, index=True)  # None for orphaned blobs
+    path = Column(String, nullable=False)
+    detail = Column(Text)
+    first_seen = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        UniqueConstraint("kind", "path", name="uq_scrub_findings_kind_path"),
+    )
\ No newline at end of file
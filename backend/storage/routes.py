@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from typing import List, Optional
 from config.database import get_db
-from auth.dependencies import get_current_user
-from files.models import FileMetadata
+from config.settings import settings
+from auth.dependencies import get_current_user, get_admin_user, is_admin
+from files.models import FileMetadata, BulkDownloadRequest
+from files.service import get_accessible_files
+from files.derivatives import (
+    DERIVATIVE_MIME_TYPE, is_derivable, derivative_path, derivative_filename,
+    render_derivative, save_derivative
+)
 from storage.local import LocalStorage
-import io
+from storage.cache import preview_cache
+from storage.throttle import transfer_throttle
+from storage.archive import stream_zip
+from utils.http_cache import make_etag, cache_headers, is_not_modified, not_modified_response
 
 router = APIRouter()
 storage = LocalStorage()
@@ -13,6 +24,7 @@ storage = LocalStorage()
 @router.get("/download/{file_id}")
 def download_file(
     file_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -25,31 +37,76 @@ def download_file(
     if not file_record:
         raise HTTPException(status_code=404, detail="File not found")
     
+    # Ids are reused after deletes, so clients revalidate; a 304 skips disk and decrypt
+    headers = cache_headers(make_etag(file_record.content_hash), file_record.upload_date)
+    if is_not_modified(request, headers["ETag"], file_record.upload_date):
+        return not_modified_response(headers)
+    
     # Check if file exists in storage
     if not storage.file_exists(file_record.encrypted_path):
         raise HTTPException(status_code=404, detail="File data not found")
     
+    # Wait for a transfer slot; the response body releases it when done
+    slot = transfer_throttle.acquire(current_user.id)
     try:
         # Retrieve and decrypt file
         file_data = storage.retrieve_file(file_record.encrypted_path)
         
-        # Create streaming response
-        file_stream = io.BytesIO(file_data)
-        
+        # Create streaming response, paced to the user's bandwidth share
         return StreamingResponse(
-            io.BytesIO(file_data),
+            transfer_throttle.stream(slot, [file_data]),
             media_type=file_record.mime_type,
             headers={
+                **headers,
                 "Content-Disposition": f"attachment; filename={file_record.original_name}"
             }
         )
     
     except Exception as e:
+        slot.release()
         raise HTTPException(status_code=500, detail="Error retrieving file")
 
+@router.post("/download/zip")
+def download_zip(
+    selection: BulkDownloadRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    if not selection.file_ids:
+        raise HTTPException(status_code=400, detail="No files selected")
+    if len(selection.file_ids) > settings.ZIP_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot download more than {settings.ZIP_MAX_FILES} files at once"
+        )
+    
+    # Owned by or shared with the user; anything else is reported as missing
+    file_records = get_accessible_files(db, selection.file_ids, current_user.id, current_user.email)
+    if len(file_records) != len(set(selection.file_ids)):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    # Fail before streaming starts; afterwards errors can only cut the archive short
+    if not all(storage.file_exists(f.encrypted_path) for f in file_records):
+        raise HTTPException(status_code=404, detail="File data not found")
+    
+    # The session is closed once the handler returns; the archive only needs loaded columns
+    db.expunge_all()
+    
+    slot = transfer_throttle.acquire(current_user.id)
+    filename = f"secureshare-{datetime.utcnow():%Y%m%d-%H%M%S}.zip"
+    return StreamingResponse(
+        transfer_throttle.stream(slot, stream_zip(file_records)),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
 @router.get("/preview/{file_id}")
 def preview_file(
     file_id: int,
+    request: Request,
+    size: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -67,16 +124,71 @@ def preview_file(
     if file_record.mime_type not in previewable_types:
         raise HTTPException(status_code=400, detail="File type not previewable")
     
+    if size is not None and size not in settings.PREVIEW_SIZES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Preview size must be one of {settings.PREVIEW_SIZES}"
+        )
+    
+    use_derivative = size is not None and is_derivable(file_record.mime_type)
+    if use_derivative:
+        etag = make_etag(file_record.content_hash, size)
+    else:
+        etag = make_etag(file_record.content_hash)
+    headers = cache_headers(etag, file_record.upload_date)
+    if is_not_modified(request, etag, file_record.upload_date):
+        return not_modified_response(headers)
+    
     try:
-        file_data = storage.retrieve_file(file_record.encrypted_path)
+        if use_derivative:
+            media_type = DERIVATIVE_MIME_TYPE
+            filename = derivative_filename(file_record.original_name, size)
+            chunks = read_derivative(file_record, size)
+        else:
+            media_type = file_record.mime_type
+            filename = file_record.original_name
+            chunks = read_cached(file_record.encrypted_path)
         
         return StreamingResponse(
-            io.BytesIO(file_data),
-            media_type=file_record.mime_type,
+            iter(chunks),
+            media_type=media_type,
             headers={
-                "Content-Disposition": f"inline; filename={file_record.original_name}"
+                **headers,
+                "Content-Disposition": f"inline; filename={filename}"
             }
         )
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Error retrieving file")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error retrieving file")
+
+def read_cached(blob_path: str) -> List[bytes]:
+    """Read a decrypted blob, serving repeats from the preview cache"""
+    chunks = preview_cache.get_blob(blob_path)
+    if chunks is None:
+        file_data = storage.retrieve_file(blob_path)
+        preview_cache.put_blob(blob_path, file_data)
+        chunks = [file_data]
+    return chunks
+
+def read_derivative(file_record: FileMetadata, size: int) -> List[bytes]:
+    """Read a stored preview derivative, rendering it on demand if missing"""
+    path = derivative_path(file_record.encrypted_path, size)
+    if storage.file_exists(path):
+        return read_cached(path)
+    
+    file_data = storage.retrieve_file(file_record.encrypted_path)
+    derivative = render_derivative(file_data, file_record.mime_type, size)
+    save_derivative(derivative, path)
+    preview_cache.put_blob(path, derivative)
+    return [derivative]
+
+@router.get("/cache/stats")
+def preview_cache_stats(current_user = Depends(get_admin_user)):
+    return preview_cache.stats()
+
+@router.get("/throttle/stats")
+def transfer_throttle_stats(current_user = Depends(get_current_user)):
+    # Worker-wide counters are for admins; everyone else sees their own usage
+    if is_admin(current_user):
+        return transfer_throttle.stats()
+    return transfer_throttle.user_stats(current_user.id)
\ No newline at end of file
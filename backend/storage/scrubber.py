@@ -0,0 +1,259 @@
+"""
+Background integrity scrubber for stored blobs
+Walks FileMetadata in id order from a cursor saved in scrub_state, so it
+resumes where it stopped after a restart:
+
+    python -m storage.scrubber            # run continuously
+    python -m storage.scrubber --once     # one full pass, then exit
+    python -m storage.scrubber --report   # print open findings
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import signal
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from config.database import SessionLocal, register_models
+from config.settings import settings
+from files.models import FileMetadata
+from files.encryption import get_encryption
+from files.derivatives import derivative_paths
+from files.service import format_content_hash
+from storage.models import ScrubState, ScrubFinding
+from utils.ratelimit import TokenBucket
+
+logger = logging.getLogger("storage.scrubber")
+
+MISSING_BLOB = "missing_blob"
+UNDECRYPTABLE = "undecryptable"
+HASH_MISMATCH = "hash_mismatch"
+ORPHAN_BLOB = "orphan_blob"
+
+def _normalize(path) -> str:
+    return str(Path(path).resolve())
+
+class Scrubber:
+    """Verifies blobs in small batches under I/O and CPU budgets"""
+
+    def __init__(self, bytes_per_second: int = None, cpu_duty_cycle: float = None, batch_size: int = None):
+        bytes_per_second = settings.SCRUB_BYTES_PER_SECOND if bytes_per_second is None else bytes_per_second
+        self.io_bucket = TokenBucket(bytes_per_second)
+        self.cpu_duty_cycle = cpu_duty_cycle or settings.SCRUB_CPU_DUTY_CYCLE
+        self.batch_size = batch_size or settings.SCRUB_BATCH_SIZE
+        self.stopping = False
+
+    def _throttle_cpu(self, busy_seconds: float) -> None:
+        # Sleep so that work takes at most cpu_duty_cycle of wall time
+        if 0 < self.cpu_duty_cycle < 1:
+            time.sleep(busy_seconds * (1 - self.cpu_duty_cycle) / self.cpu_duty_cycle)
+
+    def _sleep(self, seconds: float) -> None:
+        # Wake up regularly so SIGTERM is honoured between passes
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(1.0, deadline - time.monotonic()))
+
+    def _get_state(self, db: Session) -> ScrubState:
+        state = db.query(ScrubState).filter(ScrubState.id == 1).first()
+        if not state:
+            state = ScrubState(id=1, cursor=0, pass_started_at=datetime.utcnow())
+            db.add(state)
+            db.commit()
+        return state
+
+    def _record(self, db: Session, kind: str, path: str, file_id: int = None, detail: str = None) -> None:
+        now = datetime.utcnow()
+        finding = db.query(ScrubFinding).filter(
+            ScrubFinding.kind == kind,
+            ScrubFinding.path == path
+        ).first()
+        if finding:
+            finding.last_seen = now
+            finding.detail = detail
+            finding.resolved_at = None
+        else:
+            db.add(ScrubFinding(kind=kind, path=path, file_id=file_id, detail=detail, first_seen=now, last_seen=now))
+            logger.warning("Scrub finding %s: %s (file %s) %s", kind, path, file_id, detail or "")
+
+    def _resolve(self, db: Session, path: str, kinds) -> None:
+        db.query(ScrubFinding).filter(
+            ScrubFinding.path == path,
+            ScrubFinding.kind.in_(kinds),
+            ScrubFinding.resolved_at.is_(None)
+        ).update({ScrubFinding.resolved_at: datetime.utcnow()}, synchronize_session=False)
+
+    def check_file(self, db: Session, file_record: FileMetadata) -> Optional[str]:
+        """Verify one blob; returns the finding kind or None if healthy"""
+        path = file_record.encrypted_path
+        if not os.path.exists(path):
+            self._record(db, MISSING_BLOB, path, file_record.id)
+            return MISSING_BLOB
+
+        # Read, decrypt and hash chunk by chunk so the I/O budget paces every
+        # read and only one chunk of plaintext is held at a time
+        hasher = hashlib.sha256()
+        chunks = get_encryption().decrypt_file_stream(path, settings.SCRUB_CHUNK_SIZE, self.io_bucket.consume)
+        try:
+            # Thread CPU time leaves out the I/O budget's sleeps
+            started = time.thread_time()
+            for chunk in chunks:
+                hasher.update(chunk)
+                self._throttle_cpu(time.thread_time() - started)
+                started = time.thread_time()
+        except Exception as e:
+            self._record(db, UNDECRYPTABLE, path, file_record.id, type(e).__name__)
+            return UNDECRYPTABLE
+
+        content_hash = format_content_hash(hasher.hexdigest())
+        if content_hash != file_record.content_hash:
+            self._record(db, HASH_MISMATCH, path, file_record.id, f"expected {file_record.content_hash}, got {content_hash}")
+            return HASH_MISMATCH
+
+        self._resolve(db, path, [MISSING_BLOB, UNDECRYPTABLE, HASH_MISMATCH])
+        return None
+
+    def scrub_batch(self, db: Session) -> bool:
+        """Check the next batch after the cursor; returns False when the pass is complete"""
+        state = self._get_state(db)
+        batch = db.query(FileMetadata).filter(
+            FileMetadata.id > state.cursor
+        ).order_by(FileMetadata.id).limit(self.batch_size).all()
+
+        for file_record in batch:
+            if self.stopping:
+                break
+            self.check_file(db, file_record)
+            state.cursor = file_record.id
+            state.updated_at = datetime.utcnow()
+            # Commit per file so a restart resumes right after it
+            db.commit()
+
+        return len(batch) == self.batch_size and not self.stopping
+
+    def find_orphans(self, db: Session) -> int:
+        """Flag blobs in UPLOAD_DIR that no FileMetadata row points at"""
+        known: Set[str] = set()
+        for (encrypted_path,) in db.query(FileMetadata.encrypted_path).yield_per(1000):
+            known.add(_normalize(encrypted_path))
+            known.update(_normalize(path) for path in derivative_paths(encrypted_path))
+
+        # Blobs are written before their row commits; leave recent ones alone
+        cutoff = time.time() - settings.SCRUB_ORPHAN_GRACE_SECONDS
+        orphans = 0
+        with os.scandir(settings.UPLOAD_DIR) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                    continue
+                path = _normalize(entry.path)
+                if path in known:
+                    self._resolve(db, path, [ORPHAN_BLOB])
+                else:
+                    self._record(db, ORPHAN_BLOB, path, detail=f"{entry.stat().st_size} bytes")
+                    orphans += 1
+        db.commit()
+        return orphans
+
+    def finish_pass(self, db: Session) -> None:
+        """Sweep for orphans and start the next pass from the beginning"""
+        self.find_orphans(db)
+
+        # Findings for rows deleted since they were recorded are moot
+        live_ids = select(FileMetadata.id)
+        db.query(ScrubFinding).filter(
+            ScrubFinding.file_id.isnot(None),
+            ScrubFinding.file_id.notin_(live_ids),
+            ScrubFinding.resolved_at.is_(None)
+        ).update({ScrubFinding.resolved_at: datetime.utcnow()}, synchronize_session=False)
+
+        state = self._get_state(db)
+        now = datetime.utcnow()
+        state.cursor = 0
+        state.last_pass_finished_at = now
+        state.pass_started_at = now
+        db.commit()
+        logger.info("Scrub pass complete")
+
+    def run(self, once: bool = False) -> None:
+        """Scrub continuously (or for one pass) until stopped"""
+        while not self.stopping:
+            db = SessionLocal()
+            try:
+                more = self.scrub_batch(db)
+                if not more and not self.stopping:
+                    self.finish_pass(db)
+                    if once:
+                        return
+                    self._sleep(settings.SCRUB_PASS_INTERVAL_SECONDS)
+            except Exception:
+                # e.g. "database is locked" next to the API and job workers;
+                # the cursor is committed per file, so retrying resumes cleanly
+                logger.exception("Scrub batch failed; retrying in %ss", settings.SCRUB_RETRY_SECONDS)
+                db.rollback()
+                self._sleep(settings.SCRUB_RETRY_SECONDS)
+            finally:
+                db.close()
+
+def report(db: Session) -> Dict:
+    """Summary of open findings and scrub progress"""
+    state = db.query(ScrubState).filter(ScrubState.id == 1).first()
+    open_findings = db.query(ScrubFinding).filter(
+        ScrubFinding.resolved_at.is_(None)
+    ).order_by(ScrubFinding.first_seen).all()
+
+    counts: Dict[str, int] = {}
+    for finding in open_findings:
+        counts[finding.kind] = counts.get(finding.kind, 0) + 1
+
+    return {
+        "cursor": state.cursor if state else 0,
+        "passStartedAt": state.pass_started_at.isoformat() if state and state.pass_started_at else None,
+        "lastPassFinishedAt": state.last_pass_finished_at.isoformat() if state and state.last_pass_finished_at else None,
+        "openFindings": counts,
+        "findings": [
+            {
+                "kind": f.kind,
+                "fileId": f.file_id,
+                "path": f.path,
+                "detail": f.detail,
+                "firstSeen": f.first_seen.isoformat() if f.first_seen else None,
+                "lastSeen": f.last_seen.isoformat() if f.last_seen else None
+            }
+            for f in open_findings
+        ]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify stored blobs against their metadata")
+    parser.add_argument("--once", action="store_true", help="Run a single full pass and exit")
+    parser.add_argument("--report", action="store_true", help="Print open findings and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    register_models()
+
+    if args.report:
+        db = SessionLocal()
+        try:
+            print(json.dumps(report(db), indent=2))
+        finally:
+            db.close()
+        return
+
+    scrubber = Scrubber()
+
+    def request_stop(signum, frame):
+        scrubber.stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    scrubber.run(once=args.once)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,204 @@
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Set
+from fastapi import HTTPException
+from config.settings import settings
+from utils.ratelimit import TokenBucket
+
+class TransferSlot:
+    """One admitted transfer; release() is idempotent"""
+
+    def __init__(self, throttle: "TransferThrottle", user_id: int):
+        self.throttle = throttle
+        self.user_id = user_id
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.throttle._release(self.user_id)
+
+    def __enter__(self) -> "TransferSlot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+class ThrottledStream:
+    """Iterator that paces chunks through the user's and worker's buckets and
+    frees the transfer slot when exhausted, closed or dropped"""
+
+    def __init__(self, throttle: "TransferThrottle", slot: TransferSlot, chunks: Iterable[bytes]):
+        self.throttle = throttle
+        self.slot = slot
+        self._chunks = throttle._split(chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            chunk = next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+        self.throttle.pace(self.slot.user_id, len(chunk))
+        return chunk
+
+    def close(self) -> None:
+        self.slot.release()
+
+    def __del__(self):
+        self.close()
+
+class TransferThrottle:
+    """Per-user and per-worker fair-share limits for uploads and downloads
+
+    Bandwidth over a user's or the worker's share is shaped by sleeping
+    between chunks. Transfer handlers run in the shared threadpool, so
+    waiting for a slot must not tie up threads: a user already at their
+    concurrency cap gets 429 at once, and only TRANSFER_WORKER_MAX_WAITERS
+    requests (one per user) may queue for a worker slot, for at most
+    TRANSFER_SLOT_WAIT_SECONDS. All limits are per worker process; with
+    `start.py --prod` the server-wide totals are WORKERS times these.
+    """
+
+    def __init__(self):
+        self.worker_bucket = TokenBucket(settings.TRANSFER_WORKER_BYTES_PER_SEC)
+        self._user_buckets: Dict[int, TokenBucket] = {}
+        self._active: Dict[int, int] = {}
+        self._active_total = 0
+        self._waiting: Set[int] = set()
+        self._condition = threading.Condition()
+        self._stats = {
+            'transfers': 0,
+            'bytes': 0,
+            'shapedSeconds': 0.0,
+            'slotWaits': 0,
+            'slotWaitSeconds': 0.0,
+            'rejected': 0
+        }
+
+    def _user_bucket(self, user_id: int) -> TokenBucket:
+        with self._condition:
+            bucket = self._user_buckets.get(user_id)
+            if bucket is None:
+                if len(self._user_buckets) > 10000:
+                    # Forget idle users; a fresh bucket starts full anyway
+                    for idle in [uid for uid in self._user_buckets if uid not in self._active]:
+                        del self._user_buckets[idle]
+                bucket = TokenBucket(settings.TRANSFER_USER_BYTES_PER_SEC)
+                self._user_buckets[user_id] = bucket
+            return bucket
+
+    def _user_at_cap(self, user_id: int) -> bool:
+        return self._active.get(user_id, 0) >= settings.TRANSFER_USER_MAX_CONCURRENT
+
+    def _worker_at_cap(self) -> bool:
+        return self._active_total >= settings.TRANSFER_WORKER_MAX_CONCURRENT
+
+    def _reject(self) -> HTTPException:
+        self._stats['rejected'] += 1
+        return HTTPException(
+            status_code=429,
+            detail="Too many concurrent transfers",
+            headers={"Retry-After": str(max(1, int(settings.TRANSFER_SLOT_WAIT_SECONDS)))}
+        )
+
+    def acquire(self, user_id: int) -> TransferSlot:
+        """Take a transfer slot, raising 429 instead of queueing behind the user's own transfers"""
+        with self._condition:
+            if self._user_at_cap(user_id):
+                raise self._reject()
+
+            if self._worker_at_cap():
+                if user_id in self._waiting or len(self._waiting) >= settings.TRANSFER_WORKER_MAX_WAITERS:
+                    raise self._reject()
+
+                started = time.monotonic()
+                deadline = started + settings.TRANSFER_SLOT_WAIT_SECONDS
+                self._waiting.add(user_id)
+                self._stats['slotWaits'] += 1
+                try:
+                    while self._worker_at_cap() or self._user_at_cap(user_id):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise self._reject()
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting.discard(user_id)
+                self._stats['slotWaitSeconds'] += time.monotonic() - started
+
+            self._active[user_id] = self._active.get(user_id, 0) + 1
+            self._active_total += 1
+            self._stats['transfers'] += 1
+        return TransferSlot(self, user_id)
+
+    def _release(self, user_id: int) -> None:
+        with self._condition:
+            count = self._active.get(user_id, 0) - 1
+            if count > 0:
+                self._active[user_id] = count
+            else:
+                self._active.pop(user_id, None)
+            self._active_total -= 1
+            self._condition.notify_all()
+
+    def charge(self, user_id: int, size: int) -> None:
+        """Count size bytes that were transferred without pacing against both shares
+
+        Debt is capped at one bucket's burst, so the next paced transfer
+        waits at most capacity / rate seconds rather than size / rate.
+        """
+        self._user_bucket(user_id).debit(size)
+        self.worker_bucket.debit(size)
+        with self._condition:
+            self._stats['bytes'] += size
+
+    def pace(self, user_id: int, size: int) -> None:
+        """Account for size bytes and sleep long enough to stay within both shares"""
+        delay = max(
+            self._user_bucket(user_id).reserve(size),
+            self.worker_bucket.reserve(size)
+        )
+        with self._condition:
+            self._stats['bytes'] += size
+        if delay > 0:
+            time.sleep(delay)
+            with self._condition:
+                self._stats['shapedSeconds'] += delay
+
+    def _split(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        # Small pieces keep pacing smooth instead of one long sleep per blob
+        size = settings.TRANSFER_CHUNK_SIZE
+        for chunk in chunks:
+            for offset in range(0, len(chunk), size):
+                yield chunk[offset:offset + size]
+
+    def stream(self, slot: TransferSlot, chunks: Iterable[bytes]) -> ThrottledStream:
+        """Wrap a response body so it is paced and releases slot when done"""
+        return ThrottledStream(self, slot, chunks)
+
+    def stats(self) -> dict:
+        """Worker-wide throttling counters and current activity"""
+        with self._condition:
+            return {
+                'activeTransfers': self._active_total,
+                'activeUsers': len(self._active),
+                'waitingUsers': len(self._waiting),
+                **self._stats
+            }
+
+    def user_stats(self, user_id: int) -> dict:
+        """One user's activity and limits in this worker"""
+        with self._condition:
+            return {
+                'activeTransfers': self._active.get(user_id, 0),
+                'maxConcurrent': settings.TRANSFER_USER_MAX_CONCURRENT,
+                'bytesPerSecond': settings.TRANSFER_USER_BYTES_PER_SEC
+            }
+
+transfer_throttle = TransferThrottle()
\ No newline at end of file
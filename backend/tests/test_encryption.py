@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from cryptography.fernet import Fernet, InvalidToken
+from files.encryption import FileEncryption
+
+class DecryptFileStreamTest(unittest.TestCase):
+    """decrypt_file_stream must agree with Fernet and never release unauthenticated plaintext"""
+
+    def setUp(self):
+        self.key = Fernet.generate_key()
+        self.encryption = FileEncryption(key=self.key)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "blob.enc")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_token(self, token: bytes) -> None:
+        with open(self.path, "wb") as f:
+            f.write(token)
+
+    def decrypt(self, chunk_size: int = 64 * 1024) -> bytes:
+        return b"".join(self.encryption.decrypt_file_stream(self.path, chunk_size))
+
+    def test_round_trip(self):
+        sizes = [0, 1, 15, 16, 17, 31, 32, 33, 1000, 64 * 1024, 64 * 1024 + 1]
+        chunk_sizes = [1, 2, 3, 4, 5, 16, 1000, 64 * 1024]
+        for size in sizes:
+            data = os.urandom(size)
+            self.encryption.encrypt_file_to_disk(data, self.path)
+            for chunk_size in chunk_sizes:
+                with self.subTest(size=size, chunk_size=chunk_size):
+                    self.assertEqual(self.decrypt(chunk_size), data)
+
+    def test_round_trip_large(self):
+        data = os.urandom(1024 * 1024 + 3)
+        self.encryption.encrypt_file_to_disk(data, self.path)
+        for chunk_size in [1000, 64 * 1024, 256 * 1024]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.decrypt(chunk_size), data)
+
+    def test_reads_tokens_from_fernet(self):
+        data = os.urandom(5000)
+        self.write_token(Fernet(self.key).encrypt(data))
+        self.assertEqual(self.decrypt(100), data)
+
+    def test_chunks_are_bounded(self):
+        data = os.urandom(300 * 1024)
+        self.encryption.encrypt_file_to_disk(data, self.path)
+        chunks = list(self.encryption.decrypt_file_stream(self.path, 16 * 1024))
+        self.assertGreater(len(chunks), 1)
+        self.assertLessEqual(max(len(chunk) for chunk in chunks), 16 * 1024 + 16)
+
+    def test_on_read_sees_both_passes(self):
+        self.encryption.encrypt_file_to_disk(os.urandom(10000), self.path)
+        reads = []
+        list(self.encryption.decrypt_file_stream(self.path, 1000, on_read=reads.append))
+        self.assertEqual(sum(reads), 2 * os.path.getsize(self.path))
+
+    def assert_rejected(self, chunk_size: int = 64 * 1024) -> None:
+        stream = self.encryption.decrypt_file_stream(self.path, chunk_size)
+        # Rejected before the first plaintext chunk is released
+        with self.assertRaises(InvalidToken):
+            next(stream)
+
+    def test_tampered_byte(self):
+        token = bytearray(self.encryption.encrypt_file(os.urandom(4096)))
+        for position in [0, 10, 40, len(token) // 2, len(token) - 5]:
+            with self.subTest(position=position):
+                tampered = bytearray(token)
+                tampered[position] = ord("A") if tampered[position] != ord("A") else ord("B")
+                self.write_token(bytes(tampered))
+                self.assert_rejected()
+                self.assert_rejected(chunk_size=7)
+
+    def test_truncated(self):
+        token = self.encryption.encrypt_file(os.urandom(4096))
+        for length in [0, 1, 4, 40, 100, len(token) // 2, len(token) - 4, len(token) - 1]:
+            with self.subTest(length=length):
+                self.write_token(token[:length])
+                self.assert_rejected()
+
+    def test_appended_data(self):
+        token = self.encryption.encrypt_file(os.urandom(100))
+        self.write_token(token + self.encryption.encrypt_file(b"more"))
+        for chunk_size in [3, 64 * 1024]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assert_rejected(chunk_size)
+
+    def test_trailing_whitespace(self):
+        data = os.urandom(100)
+        self.write_token(self.encryption.encrypt_file(data) + b"\n" * 9)
+        for chunk_size in [3, 64 * 1024]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.decrypt(chunk_size), data)
+
+    def test_not_base64(self):
+        for token in [b"this is not base64 at all!!", b"****", b"\xff\xfe\x00\x01" * 30, b"gAAAAA==" * 20]:
+            with self.subTest(token=token[:12]):
+                self.write_token(token)
+                self.assert_rejected()
+
+    def test_wrong_key(self):
+        self.write_token(FileEncryption(key=Fernet.generate_key()).encrypt_file(b"secret"))
+        self.assert_rejected()
+
+    def test_changed_between_passes(self):
+        self.encryption.encrypt_file_to_disk(os.urandom(1000), self.path)
+        real_fstat = os.fstat
+        calls = []
+
+        def fstat(fd):
+            result = real_fstat(fd)
+            calls.append(fd)
+            if len(calls) == 1:
+                return result
+            # The second look sees a file rewritten in place
+            return SimpleNamespace(st_size=result.st_size, st_mtime_ns=result.st_mtime_ns + 1)
+
+        with mock.patch("files.encryption.os.fstat", side_effect=fstat):
+            self.assert_rejected()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+from fastapi import Request, Response
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from identifying parts"""
+    return '"' + '-'.join(str(part) for part in parts) + '"'
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps that were stored as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def http_date(value: datetime) -> str:
+    """Format a timestamp as an HTTP date"""
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, cache_control: str = "private, no-cache") -> Dict[str, str]:
+    """Validator and caching headers for a response"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current validators"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses weak comparison
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return any(
+            tag == "*" or tag.removeprefix("W/") == etag.removeprefix("W/")
+            for tag in candidates
+        )
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None:
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    
+    return False
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Empty 304 response carrying the current validators"""
+    return Response(status_code=304, headers=headers)
\ No newline at end of file
@@ -0,0 +1,42 @@
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket; rate is tokens per second, capacity the burst size"""
+    
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def reserve(self, amount: float) -> float:
+        """Take tokens now (possibly going into debt) and return seconds to wait"""
+        if self.rate <= 0:
+            return 0.0  # Unlimited
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def debit(self, amount: float) -> None:
+        """Take tokens without waiting; debt is capped at one burst (capacity)"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = max(-self.capacity, self._tokens - amount)
+    
+    def consume(self, amount: float) -> float:
+        """Block until the tokens are available; returns seconds slept"""
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
\ No newline at end of file